@@ -0,0 +1,153 @@
+# Modo daemon: worker de limpeza que fica em execução
+#
+# Mantém em memória o mapeamento canônico de produtos e entidades, a moda do
+# frete por cidade e a marca mais comum por produto, e processa os CSVs
+# colocados na pasta de entrada de uma fila local com um pool de workers.
+#
+# Estrutura da fila:
+#   entrada/      CSVs a processar (mova o arquivo pronto para cá)
+#   processando/  CSVs em processamento, renomeados com o id do job (<id>_<nome>.csv)
+#   saida/        CSV limpo, mapeamento das entidades e relatório de cada job
+#   concluidos/   CSVs processados com sucesso
+#   erros/        CSVs que falharam
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import time
+import uuid
+
+from main import readCsv, clean_dataframe, build_warm_state, save_cleaned_dataframe, save_change_report
+
+QUEUE_DIRS = ['entrada', 'processando', 'saida', 'concluidos', 'erros']
+
+# Cria as pastas da fila
+
+def prepare_queue(queue_dir):
+	"""
+	Cria as pastas da fila, caso ainda não existam.
+
+	Parâmetros:
+	queue_dir (str): Pasta raiz da fila.
+	"""
+	for name in QUEUE_DIRS:
+		os.makedirs(os.path.join(queue_dir, name), exist_ok=True)
+
+# Pega um arquivo da pasta de entrada
+
+def claim_job(file_name, queue_dir):
+	"""
+	Move um CSV da pasta de entrada para a pasta 'processando', com um id de job
+	no início do nome para que um arquivo novo com o mesmo nome não sobrescreva
+	um job em andamento.
+
+	Parâmetros:
+	file_name (str): Nome do CSV na pasta 'entrada'.
+	queue_dir (str): Pasta raiz da fila.
+
+	Retorna:
+	str: Nome do job na pasta 'processando', ou None se o arquivo não pôde ser movido
+	(ex.: removido da pasta de entrada antes de ser pego).
+	"""
+	job_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}_{file_name}"
+	try:
+		os.replace(os.path.join(queue_dir, 'entrada', file_name), os.path.join(queue_dir, 'processando', job_name))
+	except OSError as e:
+		print(f"Não foi possível pegar o arquivo '{file_name}': {e}")
+		return None
+	return job_name
+
+# Processa um job da fila
+
+def process_job(file_name, queue_dir, state, backend='pandas'):
+	"""
+	Limpa um CSV da fila e grava o resultado, o mapeamento das entidades e o
+	relatório de alterações na pasta de saída.
+
+	Parâmetros:
+	file_name (str): Nome do CSV na pasta 'processando'.
+	queue_dir (str): Pasta raiz da fila.
+	state (dict): Estado mantido em memória (ver build_warm_state).
+	backend (str): Backend das etapas de limpeza ('pandas' ou 'polars').
+	"""
+	file_path = os.path.join(queue_dir, 'processando', file_name)
+	name = os.path.splitext(file_name)[0]
+	start = time.perf_counter()
+	try:
+		df = readCsv(file_path)
+		if df is None:
+			raise ValueError("Não foi possível ler o arquivo.")
+
+		df_mod, entity_mapping = clean_dataframe(df.copy(), backend, state)
+
+		df.columns = df.columns.str.upper()
+		df_mod.columns = df_mod.columns.str.upper()
+
+		output_dir = os.path.join(queue_dir, 'saida')
+		save_cleaned_dataframe(df_mod, os.path.join(output_dir, f'{name}_normalizado.csv'))
+		if entity_mapping is not None:
+			save_cleaned_dataframe(entity_mapping, os.path.join(output_dir, f'{name}_mapeamento_entidades.csv'))
+		save_change_report(df, df_mod, os.path.join(output_dir, f'{name}_relatorio.md'))
+
+		os.replace(file_path, os.path.join(queue_dir, 'concluidos', file_name))
+		print(f"Job '{file_name}' concluído em {(time.perf_counter() - start) * 1000:.0f} ms")
+	except Exception as e:
+		print(f"Erro ao processar o job '{file_name}': {e}")
+		try:
+			os.replace(file_path, os.path.join(queue_dir, 'erros', file_name))
+		except OSError as e:
+			print(f"Não foi possível mover o job '{file_name}' para a pasta de erros: {e}")
+
+# Observa a pasta de entrada da fila
+
+def run_daemon(queue_dir, state, backend='pandas', workers=4, interval=0.2):
+	"""
+	Observa a pasta de entrada da fila e envia cada CSV novo para o pool de workers.
+
+	Parâmetros:
+	queue_dir (str): Pasta raiz da fila.
+	state (dict): Estado mantido em memória (ver build_warm_state).
+	backend (str): Backend das etapas de limpeza ('pandas' ou 'polars').
+	workers (int): Quantidade de workers do pool.
+	interval (float): Intervalo, em segundos, entre as verificações da pasta de entrada.
+	"""
+	prepare_queue(queue_dir)
+	input_dir = os.path.join(queue_dir, 'entrada')
+	print(f"Aguardando jobs em '{input_dir}' (Ctrl+C para encerrar)...")
+
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		try:
+			while True:
+				for file_name in sorted(os.listdir(input_dir)):
+					if not file_name.endswith('.csv'):
+						continue
+					# Move o arquivo antes de enviar ao pool para que ele não seja pego duas vezes
+					job_name = claim_job(file_name, queue_dir)
+					if job_name is not None:
+						pool.submit(process_job, job_name, queue_dir, state, backend)
+				time.sleep(interval)
+		except KeyboardInterrupt:
+			print("Encerrando o daemon após os jobs em andamento...")
+
+def main():
+	parser = argparse.ArgumentParser(description="Worker de limpeza da MegaSuper Vendas com fila local")
+	parser.add_argument('--fila', default=os.path.join(os.getcwd(), 'fila'),
+		help="Pasta raiz da fila (padrão: ./fila)")
+	parser.add_argument('--base', default=os.path.join(os.getcwd(), 'dataframe', 'vendas_modificado.csv'),
+		help="CSV de referência usado para montar o estado em memória")
+	parser.add_argument('--workers', type=int, default=4, help="Quantidade de workers do pool")
+	parser.add_argument('--backend', choices=['pandas', 'polars'], default='pandas',
+		help="Backend usado nas etapas de limpeza (polars requer: pip install polars pyarrow)")
+	args = parser.parse_args()
+
+	# Monta o estado em memória a partir da base de referência
+	print("Montando o estado em memória...")
+	df_base = readCsv(args.base) if os.path.exists(args.base) else None
+	if df_base is None:
+		print("Base de referência não encontrada; o estado será montado a partir dos jobs.")
+	state = build_warm_state(df_base, args.backend)
+
+	run_daemon(args.fila, state, args.backend, args.workers)
+
+if __name__ == '__main__':
+	main()
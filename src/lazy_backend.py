@@ -0,0 +1,253 @@
+# Backend alternativo com Polars (LazyFrame)
+#
+# Reproduz as etapas de limpeza do main.py como planos de consulta preguiçosos:
+# as etapas de cada bloco são fundidas em poucas passadas multithread sobre os
+# dados, sem os DataFrames temporários de cada etapa do pandas.
+#
+# Dependência opcional: pip install polars pyarrow
+
+import polars as pl
+
+# Funções auxiliares
+
+def _mode(column):
+	"""
+	Expressão da moda de uma coluna, desempatando pelo menor valor
+	(mesmo resultado de pd.Series.mode().iloc[0]).
+	"""
+	return pl.col(column).drop_nulls().mode().sort().first()
+
+def _median(column):
+	"""
+	Expressão da mediana de uma coluna calculada como a do pandas: média dos dois
+	valores centrais ((a + b) / 2). A mediana do Polars interpola (a + (b - a) / 2),
+	o que muda a última casa do float e, às vezes, o arredondamento para 2 casas.
+	"""
+	return (pl.col(column).quantile(0.5, interpolation='lower') + pl.col(column).quantile(0.5, interpolation='higher')) / 2
+
+def _has_columns(schema, *columns):
+	"""
+	Verifica se todas as colunas existem no schema.
+	"""
+	return all(column in schema for column in columns)
+
+def _to_lazy(df, str_columns=()):
+	"""
+	Converte um DataFrame do pandas em LazyFrame. O Arrow não aceita colunas
+	'object' com tipos misturados (ex.: CEP lido como 12345678 e '12345-678' no
+	mesmo arquivo), então os valores que não são texto dessas colunas são
+	convertidos antes: viram nulos nas colunas de str_columns, como no acessor
+	.str do pandas, e texto nas demais, que o pandas converte com pd.to_numeric.
+	"""
+	df = df.copy()
+	for column in df.columns[df.dtypes == object]:
+		if column in str_columns:
+			df[column] = df[column].where(df[column].map(lambda x: isinstance(x, str)).astype(bool), None)
+		else:
+			df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+	return pl.from_pandas(df).lazy()
+
+def _is_string(schema, column):
+	"""
+	Verifica se a coluna existe no schema e é do tipo texto.
+	"""
+	return column in schema and schema[column] == pl.String
+
+# Etapas iniciais (antes da normalização dos produtos)
+
+# Colunas tratadas com o acessor .str no backend pandas (correct_text_capitalization,
+# normalize_monetary_values e correct_cep_format), que troca por NaN os valores que não são texto
+STR_COLUMNS = ['cliente', 'produto', 'status', 'cidade', 'pais', 'pagamento', 'vendedor', 'marca', 'valor', 'cep']
+
+def pre_clean_lazy(df, status_map):
+	"""
+	Executa em um único plano as etapas iniciais da limpeza:
+	- clean_whitespace;
+	- normalize_status;
+	- remove_special_characters na coluna 'produto';
+	- normalize_monetary_values na coluna 'valor'.
+
+	Parâmetros:
+	df (pd.DataFrame): O DataFrame contendo os dados.
+	status_map (dict): Mapeamento usado para normalizar a coluna 'status'.
+
+	Retorna:
+	pd.DataFrame: O DataFrame com as etapas aplicadas.
+	"""
+	lf = _to_lazy(df, STR_COLUMNS)
+	schema = lf.collect_schema()
+
+	# Remove espaços em branco de todas as colunas de texto
+	lf = lf.with_columns(pl.col(pl.String).str.strip_chars())
+
+	expressions = []
+
+	# Normaliza a coluna 'status', mantendo os valores sem mapeamento
+	if _is_string(schema, 'status'):
+		expressions.append(
+			pl.col('status').replace_strict(status_map, default=pl.col('status'), return_dtype=pl.String)
+		)
+
+	# Remove caracteres especiais da coluna 'produto'
+	if _is_string(schema, 'produto'):
+		expressions.append(pl.col('produto').str.replace_all(r'[^\w\s]', ''))
+
+	# Normaliza os valores monetários
+	if _is_string(schema, 'valor'):
+		expressions.append(
+			pl.col('valor')
+			.str.replace_all(r'[^\d,\.]', '')
+			.str.replace_all(',', '.', literal=True)
+			.cast(pl.Float64, strict=False)
+			.round(2)
+		)
+
+	if expressions:
+		lf = lf.with_columns(expressions)
+
+	return lf.collect().to_pandas()
+
+# Etapas finais (após a resolução de produtos e entidades)
+
+def post_clean_lazy(df, frete_por_cidade=None, marca_por_produto=None):
+	"""
+	Executa em um único plano as etapas finais da limpeza, na mesma ordem do
+	backend pandas: fill_missing_vendedor, normalize_price_data,
+	fill_missing_values, normalize_numeric_columns, normalize_datetime_columns,
+	correct_cep_format, calculate_total, remoção de vendedores nulos,
+	fill_frete_by_cep, correct_column_formats, handle_missing_values,
+	handle_inconsistent_values, resolve_product_brand_discrepancies e
+	remoção de duplicatas.
+
+	Parâmetros:
+	df (pd.DataFrame): O DataFrame contendo os dados.
+	frete_por_cidade (dict): Moda do frete por cidade já conhecida (modo daemon).
+	marca_por_produto (dict): Marca mais comum por produto já conhecida (modo daemon).
+
+	Retorna:
+	pd.DataFrame: O DataFrame limpo.
+	"""
+	lf = _to_lazy(df)
+	schema = lf.collect_schema()
+	grupo = ['produto', 'marca']
+
+	# Preenche o 'vendedor' com a moda por 'id_da_compra'
+	if _has_columns(schema, 'vendedor', 'id_da_compra'):
+		lf = lf.with_columns(
+			pl.when(pl.col('id_da_compra').is_not_null())
+			.then(pl.coalesce(_mode('vendedor').over('id_da_compra'), pl.col('vendedor')))
+			.alias('vendedor')
+		)
+
+	# Preenche o 'valor' com a mediana por produto + marca e remove os outliers
+	if _has_columns(schema, 'valor', *grupo):
+		q1 = pl.col('valor').quantile(0.25, interpolation='linear').over(grupo)
+		q3 = pl.col('valor').quantile(0.75, interpolation='linear').over(grupo)
+		iqr = q3 - q1
+		lf = (
+			lf.filter(pl.col('produto').is_not_null() & pl.col('marca').is_not_null())
+			.with_columns(pl.col('valor').cast(pl.Float64, strict=False))
+			.with_columns(pl.col('valor').fill_null(_median('valor').over(grupo)))
+			.filter(pl.col('valor').is_between(q1 - 1.5 * iqr, q3 + 1.5 * iqr))
+			.with_columns(pl.col('valor').round(2))
+		)
+
+	# Preenche o frete com a moda já conhecida da cidade, antes do preenchimento global
+	if frete_por_cidade and _has_columns(schema, 'cidade', 'frete'):
+		lf = lf.with_columns(
+			pl.col('frete').fill_null(
+				pl.col('cidade').cast(pl.String).replace_strict(frete_por_cidade, default=None, return_dtype=pl.Float64)
+			)
+		)
+
+	# Preenche 'valor' e 'frete' com a média entre média e mediana (no pandas, a etapa
+	# falha e é ignorada se alguma das colunas ainda não for numérica)
+	filled_schema = lf.collect_schema()
+	if _has_columns(schema, 'valor', 'frete') and all(filled_schema[column].is_numeric() for column in ['valor', 'frete']):
+		lf = lf.with_columns([
+			pl.col(column).fill_null((pl.col(column).mean() + _median(column)) / 2)
+			for column in ['valor', 'frete']
+		])
+
+	# Converte para numérico as colunas que ainda estão como texto
+	numeric_columns = ['valor', 'quantidade', 'frete', 'total']
+	lf = lf.with_columns([
+		pl.col(column).cast(pl.Float64, strict=False)
+		for column in numeric_columns if _is_string(schema, column)
+	])
+
+	# Normaliza data, hora e CEP
+	expressions = []
+	if _is_string(schema, 'data'):
+		expressions.append(pl.col('data').str.to_datetime(strict=False))
+	if _is_string(schema, 'hora'):
+		expressions.append(pl.col('hora').str.to_time('%H:%M:%S', strict=False))
+	if _is_string(schema, 'cep'):
+		cep = pl.col('cep').str.replace_all(r'\D', '').str.zfill(8)
+		expressions.append(pl.concat_str([cep.str.slice(0, 5), pl.lit('-'), cep.str.slice(5)]).alias('cep'))
+	if expressions:
+		lf = lf.with_columns(expressions)
+
+	# Calcula o total e remove as linhas sem vendedor
+	if _has_columns(schema, 'valor', 'quantidade', 'frete'):
+		lf = lf.with_columns((pl.col('valor') * pl.col('quantidade') + pl.col('frete')).round(2).alias('total'))
+	if _has_columns(schema, 'vendedor'):
+		lf = lf.filter(pl.col('vendedor').is_not_null())
+
+	# Preenche o frete com a moda por cidade
+	if _has_columns(schema, 'cidade', 'frete'):
+		lf = lf.with_columns(
+			pl.when(pl.col('frete').is_null() & pl.col('cidade').is_not_null())
+			.then(_mode('frete').over('cidade'))
+			.otherwise(pl.col('frete'))
+			.round(2)
+			.alias('frete')
+		)
+
+	# Corrige os formatos das colunas de texto (astype(str) do pandas converte nulos em 'nan')
+	text_columns = [column for column in ['status', 'cep', 'pagamento'] if column in schema]
+	lf = lf.with_columns([
+		pl.col(column).cast(pl.String).fill_null('nan').str.strip_chars()
+		for column in text_columns
+	])
+
+	# Trata dados faltantes e valores inconsistentes
+	required_columns = [column for column in ['valor', 'quantidade', 'total'] if column in schema]
+	if required_columns:
+		lf = lf.drop_nulls(subset=required_columns)
+	defaults = {'frete': 0, 'status': 'Desconhecido', 'cep': '00000-000', 'pagamento': 'Não Especificado'}
+	lf = lf.with_columns([
+		pl.col(column).fill_null(value)
+		for column, value in defaults.items() if column in schema
+	])
+	lf = lf.with_columns([
+		pl.col(column).clip(lower_bound=0)
+		for column in ['valor', 'quantidade', 'frete'] if column in schema
+	])
+
+	# Corrige a marca pela moda da marca de cada produto, priorizando a marca já conhecida
+	if _has_columns(schema, 'produto', 'marca'):
+		moda_marca = _mode('marca').over('produto')
+		if marca_por_produto:
+			moda_marca = pl.coalesce(
+				pl.col('produto').cast(pl.String).replace_strict(marca_por_produto, default=None, return_dtype=pl.String),
+				moda_marca,
+			)
+		lf = lf.with_columns(
+			pl.when(pl.col('marca').is_not_null() & pl.col('produto').is_not_null())
+			.then(pl.coalesce(moda_marca, pl.col('marca')))
+			.otherwise(pl.col('marca'))
+			.alias('marca')
+		)
+
+	# Converte as colunas categóricas e remove duplicatas
+	categorical_columns = ['produto', 'marca', 'vendedor', 'cliente', 'pais', 'cidade', 'estado']
+	lf = (
+		lf.with_columns([
+			pl.col(column).cast(pl.String).cast(pl.Categorical)
+			for column in categorical_columns if column in schema
+		])
+		.unique(maintain_order=True)
+	)
+
+	return lf.collect().to_pandas()
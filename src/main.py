@@ -3,10 +3,16 @@
 # Bibliotecas
 
 from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+from unidecode import unidecode
+import numpy as np
 import pandas as pd
 import re
+from contextlib import nullcontext
 from datetime import datetime
+import argparse
 import os
+import threading
 
 # Ler CSV
 
@@ -41,6 +47,27 @@ def clean_whitespace(df):
 
 # Normaliza a coluna status
 
+# Dicionário de mapeamento para normalizar os status
+STATUS_MAP = {
+	'Pagamento Confirmado': 'Pagamento Confirmado',
+	'Pgto Confirmado': 'Pagamento Confirmado',
+	'PC': 'Pagamento Confirmado',
+	'Pago': 'Pagamento Confirmado',
+	'Entregue': 'Entregue',
+	'Entg': 'Entregue',
+	'Entregue com Sucesso': 'Entregue',
+	'Em Separação': 'Em Separação',
+	'Sep': 'Em Separação',
+	'Separando': 'Em Separação',
+	'Aguardando Pagamento': 'Aguardando Pagamento',
+	'Aguardando Pgto': 'Aguardando Pagamento',
+	'aguardando pagamento': 'Aguardando Pagamento',
+	'AP': 'Aguardando Pagamento',
+	'Em Transporte': 'Em Transporte',
+	'Transp': 'Em Transporte',
+	'Transportando': 'Em Transporte',
+}
+
 def normalize_status(df):
 	"""
 	Normaliza a coluna 'status' para padronizar as expressões de status.
@@ -51,29 +78,8 @@ def normalize_status(df):
 	Retorna:
 	pd.DataFrame: O DataFrame com a coluna 'status' normalizada.
 	"""
-	# Dicionário de mapeamento para normalizar os status
-	status_map = {
-		'Pagamento Confirmado': 'Pagamento Confirmado',
-		'Pgto Confirmado': 'Pagamento Confirmado',
-		'PC': 'Pagamento Confirmado',
-		'Pago': 'Pagamento Confirmado',
-		'Entregue': 'Entregue',
-		'Entg': 'Entregue',
-		'Entregue com Sucesso': 'Entregue',
-		'Em Separação': 'Em Separação',
-		'Sep': 'Em Separação',
-		'Separando': 'Em Separação',
-		'Aguardando Pagamento': 'Aguardando Pagamento',
-		'Aguardando Pgto': 'Aguardando Pagamento',
-		'aguardando pagamento': 'Aguardando Pagamento',
-		'AP': 'Aguardando Pagamento',
-		'Em Transporte': 'Em Transporte',
-		'Transp': 'Em Transporte',
-		'Transportando': 'Em Transporte',
-	}
-
 	# Aplicar o mapeamento para normalizar os valores da coluna 'status'
-	df['status'] = df['status'].str.strip().map(status_map).fillna(df['status'])
+	df['status'] = df['status'].str.strip().map(STATUS_MAP).fillna(df['status'])
 
 	return df
 
@@ -101,7 +107,7 @@ def remove_special_characters(df, columns):
 
 # Normaliza os nomes dos produtos
 
-def compare_and_normalize_products(df, column='produto', threshold=60):
+def compare_and_normalize_products(df, column='produto', threshold=60, product_mapping=None):
 	"""
 	Compara e normaliza os nomes dos produtos em um DataFrame.
 	
@@ -109,12 +115,26 @@ def compare_and_normalize_products(df, column='produto', threshold=60):
 	df (pd.DataFrame): O DataFrame contendo os dados.
 	column (str): O nome da coluna de produtos a ser normalizada.
 	threshold (int): O limiar de similaridade para agrupar produtos.
+	product_mapping (dict): Mapeamento já conhecido (modo daemon). Produtos novos são
+	comparados primeiro com os nomes canônicos dele, e o dicionário é atualizado.
 	
 	Retorna:
 	pd.DataFrame: O DataFrame com os nomes dos produtos normalizados.
 	"""
-	unique_products = df[column].dropna().unique()
-	product_mapping = {}
+	if product_mapping is None:
+		product_mapping = {}
+
+	unique_products = [product for product in df[column].dropna().unique() if product not in product_mapping]
+	canonical_products = list(set(product_mapping.values()))
+
+	# Associa os produtos novos ao nome canônico conhecido mais parecido
+	if canonical_products:
+		for product in unique_products:
+			match = rf_process.extractOne(product, canonical_products, scorer=rf_fuzz.ratio, score_cutoff=threshold)
+			if match is not None:
+				product_mapping[product] = match[0]
+
+	unique_products = [product for product in unique_products if product not in product_mapping]
 
 	for product in unique_products:
 		if product in product_mapping:
@@ -128,6 +148,181 @@ def compare_and_normalize_products(df, column='produto', threshold=60):
 	df[column] = df[column].map(product_mapping)
 	return df
 
+# Resolve variações de grafia em clientes, vendedores e cidades
+
+# Limiar de similaridade (fuzz.ratio) por coluna
+ENTITY_THRESHOLDS = {
+	'cliente': 90,
+	'vendedor': 90,
+	'cidade': 85,
+}
+
+# Colunas de nomes de pessoas: só agrupa valores com o mesmo primeiro nome, e o
+# limiar é aplicado ao restante do nome (evita juntar "Maria Silva" e "Mario Silva")
+PERSON_COLUMNS = ['cliente', 'vendedor']
+
+def normalize_entity(value):
+	"""
+	Normaliza um valor para comparação: texto sem acentos, em minúsculas, sem
+	caracteres especiais e com espaços simples.
+
+	Parâmetros:
+	value (str): O valor a ser normalizado.
+
+	Retorna:
+	str: O valor normalizado.
+	"""
+	folded = unidecode(value).lower()
+	return ' '.join(re.sub(r'[^a-z0-9\s]', ' ', folded).split())
+
+def entity_blocking_key(normalized, person=False):
+	"""
+	Gera a chave de bloqueio de um valor já normalizado: início do primeiro e do
+	último termo. Para nomes de pessoas, o primeiro nome entra inteiro na chave.
+
+	Parâmetros:
+	normalized (str): O valor normalizado (ver normalize_entity).
+	person (bool): Se a coluna contém nomes de pessoas.
+
+	Retorna:
+	str: A chave de bloqueio.
+	"""
+	tokens = normalized.split()
+	if not tokens:
+		return ''
+	first = tokens[0] if person else tokens[0][:3]
+	return f"{first}|{tokens[-1][:2]}"
+
+def entity_comparison_text(normalized, person=False):
+	"""
+	Texto usado no fuzz.ratio. Em nomes de pessoas o primeiro nome já é igual
+	dentro do bloco, então só o restante do nome é comparado.
+
+	Parâmetros:
+	normalized (str): O valor normalizado (ver normalize_entity).
+	person (bool): Se a coluna contém nomes de pessoas.
+
+	Retorna:
+	str: O texto a ser comparado.
+	"""
+	if not person:
+		return normalized
+	tokens = normalized.split(' ', 1)
+	return tokens[1] if len(tokens) > 1 else ''
+
+def build_entity_mapping(df, column, threshold, known=None):
+	"""
+	Monta a tabela de mapeamento entre as grafias encontradas em uma coluna e a
+	grafia canônica (a mais frequente de cada grupo de valores similares).
+
+	Os valores são agrupados em blocos pela chave normalizada, e o fuzz.ratio é
+	calculado em lote (rapidfuzz) apenas entre valores do mesmo bloco.
+
+	Parâmetros:
+	df (pd.DataFrame): O DataFrame contendo os dados.
+	column (str): O nome da coluna a ser resolvida.
+	threshold (int): O limiar de similaridade para agrupar valores.
+	known (dict): Entidades já conhecidas da coluna (modo daemon), com as chaves
+	'mapeamento' e 'blocos' (ver merge_entity_mapping); as grafias canônicas
+	conhecidas têm prioridade sobre as grafias novas. Não é modificado.
+
+	Retorna:
+	pd.DataFrame: Tabela com as colunas 'coluna', 'original' e 'canonico'.
+	"""
+	known_mapping = known['mapeamento'] if known is not None else {}
+	known_blocks = known['blocos'] if known is not None else {}
+	person = column in PERSON_COLUMNS
+
+	# Frequência de cada grafia; a ordem decrescente faz a mais comum virar a canônica
+	counts = df[column].dropna().value_counts()
+	rows = [(column, value, known_mapping[value]) for value in counts.index if value in known_mapping]
+	values = [value for value in counts.index if value not in known_mapping]
+
+	blocks = {}
+	for value in values:
+		normalized = normalize_entity(value)
+		blocks.setdefault(entity_blocking_key(normalized, person), []).append((value, normalized))
+
+	for key, block in blocks.items():
+		# Grafias canônicas conhecidas do mesmo bloco entram primeiro
+		known_canonicals = list(known_blocks.get(key, {}).items())
+		block = known_canonicals + block
+		n_known = len(known_canonicals)
+
+		block_values = [value for value, _ in block]
+		texts = [entity_comparison_text(normalized, person) for _, normalized in block]
+		scores = rf_process.cdist(texts, texts, scorer=rf_fuzz.ratio, score_cutoff=threshold)
+
+		assigned = set()
+		for i, canonical in enumerate(block_values):
+			if i in assigned:
+				continue
+			for j in np.flatnonzero(scores[i] >= threshold):
+				if j in assigned or (j < n_known and j != i):
+					continue
+				assigned.add(j)
+				if j >= n_known:
+					rows.append((column, block_values[j], canonical))
+
+	return pd.DataFrame(rows, columns=['coluna', 'original', 'canonico'])
+
+def merge_entity_mapping(known_entities, mapping_table):
+	"""
+	Acrescenta as grafias de uma tabela de mapeamento às entidades conhecidas
+	(modo daemon). As grafias canônicas ficam indexadas pela chave de bloqueio,
+	para que cada job só compare valores novos com os canônicos do mesmo bloco.
+
+	Os blocos alterados são substituídos por cópias, e não modificados, para que
+	outros workers possam lê-los sem trava; a chamada deve ser feita sob a trava
+	do estado.
+
+	Parâmetros:
+	known_entities (dict): Entidades conhecidas por coluna.
+	mapping_table (pd.DataFrame): Tabela gerada por resolve_entities.
+	"""
+	for column, mapping in mapping_table.groupby('coluna'):
+		known = known_entities.setdefault(column, {'mapeamento': {}, 'blocos': {}})
+		person = column in PERSON_COLUMNS
+		for original, canonical in zip(mapping['original'], mapping['canonico']):
+			if original in known['mapeamento']:
+				continue
+			known['mapeamento'][original] = canonical
+			normalized = normalize_entity(canonical)
+			key = entity_blocking_key(normalized, person)
+			if canonical not in known['blocos'].get(key, {}):
+				known['blocos'][key] = {**known['blocos'].get(key, {}), canonical: normalized}
+
+def resolve_entities(df, thresholds=None, known_entities=None):
+	"""
+	Substitui as variações de grafia das colunas de entidades pela grafia canônica.
+
+	Parâmetros:
+	df (pd.DataFrame): O DataFrame contendo os dados.
+	thresholds (dict): Limiar de similaridade por coluna (padrão: ENTITY_THRESHOLDS).
+	known_entities (dict): Entidades já conhecidas por coluna (modo daemon).
+
+	Retorna:
+	tuple: O DataFrame com as entidades resolvidas e a tabela de mapeamento.
+	"""
+	if thresholds is None:
+		thresholds = ENTITY_THRESHOLDS
+	if known_entities is None:
+		known_entities = {}
+
+	mappings = []
+	for column, threshold in thresholds.items():
+		if column not in df.columns:
+			continue
+		mapping = build_entity_mapping(df, column, threshold, known_entities.get(column))
+		df[column] = df[column].map(dict(zip(mapping['original'], mapping['canonico']))).fillna(df[column])
+		mappings.append(mapping)
+
+	if mappings:
+		mapping_table = pd.concat(mappings, ignore_index=True)
+	else:
+		mapping_table = pd.DataFrame(columns=['coluna', 'original', 'canonico'])
+	return df, mapping_table
+
 # Normaliza os valores monetários
 
 def normalize_monetary_values(df, column):
@@ -187,9 +382,15 @@ def fill_missing_vendedor(df):
 	Retorna:
 	pd.DataFrame: O DataFrame com a coluna 'vendedor' preenchida.
 	"""
-	df['vendedor'] = df.groupby('id_da_compra')['vendedor'].transform(
-		lambda x: x.mode().iloc[0] if not x.mode().empty else x
+	# Moda por compra, desempatando pelo menor nome (como Series.mode); compras sem
+	# vendedor conhecido e linhas sem 'id_da_compra' ficam sem valor
+	contagem = df.groupby(['id_da_compra', 'vendedor']).size().reset_index(name='n')
+	moda = (
+		contagem.sort_values(['n', 'vendedor'], ascending=[False, True])
+		.drop_duplicates('id_da_compra')
+		.set_index('id_da_compra')['vendedor']
 	)
+	df['vendedor'] = df['id_da_compra'].map(moda)
 	return df
 
 # Limpa e padroniza a coluna de valor
@@ -201,7 +402,9 @@ def normalize_price_data(df):
 	- Preenche valores nulos com a mediana por produto + marca.
 	- Remove outliers por produto + marca.
 	- Arredonda os valores para duas casas decimais.
-	
+
+	As linhas mantêm a ordem original (não ficam agrupadas por produto + marca).
+
 	Parâmetros:
 	df (pd.DataFrame): DataFrame com colunas 'produto', 'marca' e 'preco'.
 	
@@ -213,20 +416,15 @@ def normalize_price_data(df):
 	df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
 
 	# 2. Preenche valores nulos com a mediana por produto + marca
-	df['valor'] = df.groupby(['produto', 'marca'])['valor'].transform(
-		lambda x: x.fillna(x.median())
-	)
-
-	# 3. Remove outliers dentro de cada grupo (produto + marca)
-	def remove_outliers(group):
-		Q1 = group['valor'].quantile(0.25)
-		Q3 = group['valor'].quantile(0.75)
-		IQR = Q3 - Q1
-		lower = Q1 - 1.5 * IQR
-		upper = Q3 + 1.5 * IQR
-		return group[(group['valor'] >= lower) & (group['valor'] <= upper)]
+	df['valor'] = df['valor'].fillna(df.groupby(['produto', 'marca'])['valor'].transform('median'))
 
-	df = df.groupby(['produto', 'marca'], group_keys=False).apply(remove_outliers)
+	# 3. Remove outliers dentro de cada grupo (produto + marca); linhas sem produto
+	# ou marca ficam sem quartis e também são removidas
+	grupos = df.groupby(['produto', 'marca'])['valor']
+	Q1 = grupos.transform('quantile', 0.25)
+	Q3 = grupos.transform('quantile', 0.75)
+	IQR = Q3 - Q1
+	df = df[(df['valor'] >= Q1 - 1.5 * IQR) & (df['valor'] <= Q3 + 1.5 * IQR)].copy()
 
 	# 4. Arredonda os preços
 	df['valor'] = df['valor'].round(2)
@@ -435,12 +633,14 @@ def handle_inconsistent_values(df):
 
 # Corrige as marcas de acordo com o produto
 
-def resolve_product_brand_discrepancies(df):
+def resolve_product_brand_discrepancies(df, marca_por_produto=None):
 	"""
 	Corrige inconsistências entre 'produto' e 'marca' com base na moda da marca para cada produto.
 	
 	Parâmetros:
 	df (pd.DataFrame): DataFrame com as colunas 'produto' e 'marca'.
+	marca_por_produto (dict): Marca mais comum por produto já conhecida (modo daemon),
+	com prioridade sobre a moda calculada no próprio DataFrame.
 	
 	Retorna:
 	pd.DataFrame: DataFrame com inconsistências corrigidas.
@@ -453,20 +653,21 @@ def resolve_product_brand_discrepancies(df):
 
 	# Calcula a moda (marca mais comum) para cada produto
 	marca_mais_comum = df_validos.groupby('produto')['marca'].agg(lambda x: x.mode().iloc[0] if not x.mode().empty else "Desconhecido")
+	if marca_por_produto:
+		marca_mais_comum = pd.Series({**marca_mais_comum.to_dict(), **marca_por_produto})
 
-	# Cria uma coluna com a marca esperada
-	df_corrigido['marca_esperada'] = df_corrigido['produto'].map(marca_mais_comum)
+	# Compara como texto: 'produto' e 'marca' podem ser categóricas com categorias
+	# diferentes das da marca esperada (ex.: marcas do estado do modo daemon)
+	marca = df_corrigido['marca'].astype(object)
+	marca_esperada = df_corrigido['produto'].astype(object).map(marca_mais_comum).astype(object)
 
 	# Substitui a marca incorreta pela marca esperada (se for diferente e ambos não forem nulos)
-	df_corrigido.loc[
-		df_corrigido['marca'].notna() &
-		df_corrigido['marca_esperada'].notna() &
-		(df_corrigido['marca'] != df_corrigido['marca_esperada']),
-		'marca'
-	] = df_corrigido['marca_esperada']
+	incorretas = marca.notna() & marca_esperada.notna() & (marca != marca_esperada)
+	marca = marca.where(~incorretas, marca_esperada)
 
-	# Remove a coluna auxiliar
-	df_corrigido.drop(columns=['marca_esperada'], inplace=True)
+	if isinstance(df_corrigido['marca'].dtype, pd.CategoricalDtype):
+		marca = marca.astype('category')
+	df_corrigido['marca'] = marca
 
 	return df_corrigido
 
@@ -578,130 +779,274 @@ def generate_dataframe_change_report(df_before, df_after, primary_key='id_da_com
 
 	return report
 
-# Lê o arquivo CSV e cria um DataFrame
-file_path = os.path.join(os.getcwd(), 'dataframe', 'vendas_modificado.csv')
-df = readCsv(file_path)
-df_mod = None
-# Verifica se o DataFrame foi criado
-if df is not None:
-	print("DataFrame criado com sucesso.")
-	df_mod = df.copy()
-else:
-	print("Erro ao criar o DataFrame. Verifique o arquivo CSV.")
-
-# Aplicando a função ao DataFrame
-df_mod = clean_whitespace(df_mod)
-
-# Normaliza a coluna 'status' do DataFrame
-if df_mod is not None and 'status' in df_mod.columns:
-	print("Normalizando a coluna 'status'...")
-	df_mod = normalize_status(df_mod)
-
-# Chamando a função para remover caracteres especiais das colunas desejadas
-if df_mod is not None and 'produto' in df_mod.columns:
-	print("Removendo caracteres especiais da coluna 'produto'...")
-	df_mod = remove_special_characters(df_mod, ['produto'])
-
-# Aplicando a função para normalizar os nomes dos produtos
-if df_mod is not None and 'produto' in df_mod.columns:
-	print("Normalizando os nomes dos produtos...")
-	df_mod = compare_and_normalize_products(df_mod, column='produto')
+# Executa todas as etapas de limpeza
 
-# Normaliza os valores monetários
-if df_mod is not None and 'valor' in df_mod.columns:
-	print("Normalizando os valores monetários...")
-	df_mod = normalize_monetary_values(df_mod.copy(), "valor")
+def clean_dataframe(df_mod, backend='pandas', state=None):
+	"""
+	Executa todas as etapas de limpeza em um DataFrame.
+	
+	Parâmetros:
+	df_mod (pd.DataFrame): O DataFrame a ser limpo (é modificado).
+	backend (str): Backend das etapas de limpeza ('pandas' ou 'polars').
+	state (dict): Estado mantido em memória pelo modo daemon (ver build_warm_state).
+	Os mapeamentos de produtos e entidades são atualizados com as grafias novas, e a
+	moda do frete e a marca mais comum com as cidades e os produtos novos.
+	
+	Retorna:
+	tuple: O DataFrame limpo e a tabela de mapeamento das entidades.
+	"""
+	entity_mapping = None
+	# Os mapeamentos do estado são compartilhados entre os workers do daemon: a
+	# comparação roda sem trava e só a leitura e a atualização do estado são feitas sob ela
+	lock = state['lock'] if state is not None else nullcontext()
+	with lock:
+		frete_por_cidade = dict(state['frete_por_cidade']) if state is not None else {}
+		marca_por_produto = dict(state['marca_por_produto']) if state is not None else {}
+
+	if backend == 'polars':
+		import lazy_backend
+
+		# Etapas iniciais fundidas em um único plano do Polars
+		if df_mod is not None:
+			print("Executando as etapas iniciais com o backend polars...")
+			df_mod = lazy_backend.pre_clean_lazy(df_mod, STATUS_MAP)
+	else:
+		# Aplicando a função ao DataFrame
+		df_mod = clean_whitespace(df_mod)
+
+		# Normaliza a coluna 'status' do DataFrame
+		if df_mod is not None and 'status' in df_mod.columns:
+			print("Normalizando a coluna 'status'...")
+			df_mod = normalize_status(df_mod)
+
+		# Chamando a função para remover caracteres especiais das colunas desejadas
+		if df_mod is not None and 'produto' in df_mod.columns:
+			print("Removendo caracteres especiais da coluna 'produto'...")
+			df_mod = remove_special_characters(df_mod, ['produto'])
+
+	# Aplicando a função para normalizar os nomes dos produtos
+	if df_mod is not None and 'produto' in df_mod.columns:
+		print("Normalizando os nomes dos produtos...")
+		with lock:
+			product_mapping = dict(state['produto']) if state is not None else None
+		df_mod = compare_and_normalize_products(df_mod, column='produto', product_mapping=product_mapping)
+		if state is not None:
+			with lock:
+				for product, canonical in product_mapping.items():
+					state['produto'].setdefault(product, canonical)
+
+	# Normaliza os valores monetários (no backend polars já foi feito nas etapas iniciais)
+	if backend == 'pandas' and df_mod is not None and 'valor' in df_mod.columns:
+		print("Normalizando os valores monetários...")
+		df_mod = normalize_monetary_values(df_mod.copy(), "valor")
+
+	# Chamando a função para corrigir a capitalização
+	if df_mod is not None:
+		print("Corrigindo a capitalização dos campos de texto...")
+		df_mod = correct_text_capitalization(df_mod)
+
+	# Resolve as variações de grafia de clientes, vendedores e cidades
+	if df_mod is not None:
+		print("Resolvendo variações de clientes, vendedores e cidades...")
+		df_mod, entity_mapping = resolve_entities(df_mod, known_entities=state['entidades'] if state is not None else None)
+		if state is not None:
+			with lock:
+				merge_entity_mapping(state['entidades'], entity_mapping)
+		# Mantém apenas as grafias que foram de fato substituídas
+		entity_mapping = entity_mapping[entity_mapping['original'] != entity_mapping['canonico']]
+
+	if backend == 'polars':
+		# Etapas finais fundidas em um único plano do Polars
+		if df_mod is not None:
+			print("Executando as etapas finais com o backend polars...")
+			df_mod = lazy_backend.post_clean_lazy(df_mod, frete_por_cidade, marca_por_produto)
+	else:
+		# Preenche valores ausentes na coluna 'vendedor'
+		if df_mod is not None and 'vendedor' in df_mod.columns:
+			print("Preenchendo valores ausentes na coluna 'vendedor'...")
+			df_mod = fill_missing_vendedor(df_mod)
+
+		# Limpa e padroniza a coluna de valor
+		if df_mod is not None and 'valor' in df_mod.columns:
+			print("Normalizando os valores monetários na coluna 'valor'...")
+			df_mod = normalize_price_data(df_mod)
+
+		# Preenche o frete com a moda já conhecida da cidade (modo daemon), antes do preenchimento global
+		if frete_por_cidade and df_mod is not None and 'cidade' in df_mod.columns and 'frete' in df_mod.columns:
+			print("Preenchendo o frete com a moda conhecida por cidade...")
+			df_mod = fill_frete_by_cep(df_mod, frete_por_cidade)
+
+		# Chamando a função para preencher valores ausentes
+		if df_mod is not None and 'valor' in df_mod.columns and 'frete' in df_mod.columns:
+			print("Preenchendo valores ausentes nas colunas 'valor' e 'frete'...")
+			df_mod = fill_missing_values(df_mod, ['valor', 'frete'])
+
+		# Chamando a função para normalizar as colunas 'frete' e 'total'
+		if df_mod is not None and 'frete' in df_mod.columns and 'total' in df_mod.columns:
+			print("Normalizando as colunas 'frete' e 'total'...")
+			df_mod = normalize_numeric_columns(df_mod, ['valor', 'quantidade', 'frete', 'total'])
+
+		# Chamando a função para normalizar as colunas de data e hora
+		if df_mod is not None and 'data' in df_mod.columns and 'hora' in df_mod.columns:
+			print("Normalizando as colunas de data e hora...")
+			df_mod = normalize_datetime_columns(df_mod)
+
+		# Chamando a função para corrigir os CEPs
+		if df_mod is not None and 'cep' in df_mod.columns:
+			print("Corrigindo o formato dos CEPs...")
+			df_mod = correct_cep_format(df_mod)
+
+		# Chamando para calcular o total
+		if df_mod is not None and 'valor' in df_mod.columns and 'quantidade' in df_mod.columns and 'frete' in df_mod.columns:
+			print("Calculando o total...")
+			df_mod = calculate_total(df_mod)
+
+		# Removendo linhas onde 'vendedor' é NaN
+		if df_mod is not None and 'vendedor' in df_mod.columns:
+			print("Removendo linhas onde 'vendedor' é NaN...")
+			df_mod = df_mod.dropna(subset=['vendedor'])
+
+		# Calculando a moda do frete por cidade
+		if df_mod is not None and 'cidade' in df_mod.columns and 'frete' in df_mod.columns:
+			print("Calculando a moda do frete por cidade...")
+			moda_cep = df_mod.groupby('cidade')['frete'].agg(lambda x: x.mode().iloc[0] if not x.mode().empty else None)
+
+		# Aplicando a função ao DataFrame
+		if df_mod is not None and 'frete' in df_mod.columns:
+			print("Preenchendo os valores de frete ausentes com base no CEP...")
+			df_mod = fill_frete_by_cep(df_mod, moda_cep)
+			df_mod['frete'] = df_mod['frete'].round(2)
+
+		# Corrigindo os formatos das colunas
+		if df_mod is not None:
+			print("Corrigindo os formatos das colunas...")
+			df_mod = correct_column_formats(df_mod)
+			print("Removendo dados faltantes...")
+			df_mod = handle_missing_values(df_mod)
+			print("Corrigindo valores inconsistentes...")
+			df_mod = handle_inconsistent_values(df_mod)
+			print("Corrigindo inconsistências entre produto e marca...")
+			df_mod = resolve_product_brand_discrepancies(df_mod, marca_por_produto)
+
+		# Remover dados duplicados
+		if df_mod is not None:
+			print("Removendo dados duplicados...")
+			df_mod = df_mod.drop_duplicates()
+
+	# Acrescenta ao estado a moda do frete e a marca das cidades e produtos novos
+	if state is not None and df_mod is not None:
+		with lock:
+			merge_group_statistics(state, df_mod)
+
+	return df_mod, entity_mapping
+
+# Monta o estado mantido em memória pelo modo daemon
+
+def build_warm_state(df=None, backend='pandas'):
+	"""
+	Monta o estado reaproveitado entre os jobs do modo daemon: mapeamento canônico
+	de produtos e entidades, moda do frete por cidade e marca mais comum por produto.
+	
+	Parâmetros:
+	df (pd.DataFrame): Base de referência, limpa para preencher o estado (opcional).
+	backend (str): Backend das etapas de limpeza ('pandas' ou 'polars').
+	
+	Retorna:
+	dict: O estado com as chaves 'produto', 'entidades', 'frete_por_cidade',
+	'marca_por_produto' e 'lock' (trava dos mapeamentos).
+	"""
+	state = {'produto': {}, 'entidades': {}, 'frete_por_cidade': {}, 'marca_por_produto': {}, 'lock': threading.Lock()}
+	if df is not None:
+		# A limpeza da base preenche os mapeamentos e as estatísticas do estado
+		clean_dataframe(df.copy(), backend, state)
+	return state
 
-# Chamando a função para corrigir a capitalização
-if df_mod is not None:
-	print("Corrigindo a capitalização dos campos de texto...")
-	df_mod = correct_text_capitalization(df_mod)
+def merge_group_statistics(state, df_clean):
+	"""
+	Acrescenta ao estado do modo daemon a moda do frete por cidade e a marca mais
+	comum por produto de um DataFrame limpo. Como nos mapeamentos de produtos e
+	entidades, os valores já conhecidos têm prioridade; a chamada deve ser feita
+	sob a trava do estado.
 
-# Preenche valores ausentes na coluna 'vendedor'
-if df_mod is not None and 'vendedor' in df_mod.columns:
-	print("Preenchendo valores ausentes na coluna 'vendedor'...")
-	df_mod = fill_missing_vendedor(df_mod)
+	Parâmetros:
+	state (dict): Estado mantido em memória (ver build_warm_state).
+	df_clean (pd.DataFrame): DataFrame já limpo por clean_dataframe.
+	"""
+	def mode_or_none(x):
+		return x.mode().iloc[0] if not x.mode().empty else None
 
-# Limpa e padroniza a coluna de valor
-if df_mod is not None and 'valor' in df_mod.columns:
-	print("Normalizando os valores monetários na coluna 'valor'...")
-	df_mod = normalize_price_data(df_mod)
-
-# Chamando a função para preencher valores ausentes
-if df_mod is not None and 'valor' in df_mod.columns and 'frete' in df_mod.columns:
-	print("Preenchendo valores ausentes nas colunas 'valor' e 'frete'...")
-	df_mod = fill_missing_values(df_mod, ['valor', 'frete'])
-
-# Chamando a função para normalizar as colunas 'frete' e 'total'
-if df_mod is not None and 'frete' in df_mod.columns and 'total' in df_mod.columns:
-	print("Normalizando as colunas 'frete' e 'total'...")
-	df_mod = normalize_numeric_columns(df_mod, ['valor', 'quantidade', 'frete', 'total'])
-
-
-# Chamando a função para normalizar as colunas de data e hora
-if df_mod is not None and 'data' in df_mod.columns and 'hora' in df_mod.columns:
-	print("Normalizando as colunas de data e hora...")
-	df_mod = normalize_datetime_columns(df_mod)
-
-# Chamando a função para corrigir os CEPs
-if df_mod is not None and 'cep' in df_mod.columns:
-	print("Corrigindo o formato dos CEPs...")
-	df_mod = correct_cep_format(df_mod)
-
-# Chamando para calcular o total
-if df_mod is not None and 'valor' in df_mod.columns and 'quantidade' in df_mod.columns and 'frete' in df_mod.columns:
-	print("Calculando o total...")
-	df_mod = calculate_total(df_mod)
-
-# Removendo linhas onde 'vendedor' é NaN
-if df_mod is not None and 'vendedor' in df_mod.columns:
-	print("Removendo linhas onde 'vendedor' é NaN...")
-	df_mod = df_mod.dropna(subset=['vendedor'])
-
-# Calculando a moda do frete por cidade
-if df_mod is not None and 'cidade' in df_mod.columns and 'frete' in df_mod.columns:
-	print("Calculando a moda do frete por cidade...")
-	moda_cep = df_mod.groupby('cidade')['frete'].agg(lambda x: x.mode().iloc[0] if not x.mode().empty else None)
-
-# Aplicando a função ao DataFrame
-if df_mod is not None and 'frete' in df_mod.columns:
-	print("Preenchendo os valores de frete ausentes com base no CEP...")
-	df_mod = fill_frete_by_cep(df_mod, moda_cep)
-	df_mod['frete'] = df_mod['frete'].round(2)
-
-# Corrigindo os formatos das colunas
-if df_mod is not None:
-	print("Corrigindo os formatos das colunas...")
-	df_mod = correct_column_formats(df_mod)
-	print("Removendo dados faltantes...")
-	df_mod = handle_missing_values(df_mod)
-	print("Corrigindo valores inconsistentes...")
-	df_mod = handle_inconsistent_values(df_mod)
-	print("Corrigindo inconsistências entre produto e marca...")
-	df_mod = resolve_product_brand_discrepancies(df_mod)
-
-# Remover dados duplicados
-if df_mod is not None:
-	print("Removendo dados duplicados...")
-	df_mod = df_mod.drop_duplicates()
- 
- # Transforma o header (nomes das colunas) em maiúsculas
-df.columns = df.columns.str.upper()
-df_mod.columns = df_mod.columns.str.upper()
-
-# Chamando a função para salvar o DataFrame limpo
-if df_mod is not None:
+	if 'cidade' in df_clean.columns and 'frete' in df_clean.columns:
+		frete = df_clean.dropna(subset=['cidade']).groupby('cidade', observed=True)['frete'].agg(mode_or_none)
+		for cidade, valor in frete.items():
+			if pd.notnull(valor):
+				state['frete_por_cidade'].setdefault(str(cidade), float(valor))
+
+	if 'produto' in df_clean.columns and 'marca' in df_clean.columns:
+		marca = df_clean.dropna(subset=['produto', 'marca']).groupby('produto', observed=True)['marca'].agg(mode_or_none)
+		for produto, valor in marca.items():
+			if pd.notnull(valor):
+				state['marca_por_produto'].setdefault(str(produto), str(valor))
+
+# Gera o relatório de alterações
+
+def save_change_report(df, df_mod, file_relatorio):
+	"""
+	Gera o relatório de alterações e salva em um arquivo Markdown.
+	
+	Parâmetros:
+	df (pd.DataFrame): DataFrame original.
+	df_mod (pd.DataFrame): DataFrame limpo.
+	file_relatorio (str): O caminho do arquivo do relatório.
+	
+	Retorna:
+	str: O relatório gerado.
+	"""
+	relatorio = generate_dataframe_change_report(df, df_mod)
+	with open(file_relatorio, 'w', encoding='utf-8') as f:
+		f.write(relatorio)
+	return relatorio
+
+def main():
+	# Seleciona o backend das etapas de limpeza
+	parser = argparse.ArgumentParser(description="Limpeza de dados da MegaSuper Vendas")
+	parser.add_argument('--backend', choices=['pandas', 'polars'], default='pandas',
+		help="Backend usado nas etapas de limpeza (polars requer: pip install polars pyarrow)")
+	args = parser.parse_args()
+
+	# Lê o arquivo CSV e cria um DataFrame
+	file_path = os.path.join(os.getcwd(), 'dataframe', 'vendas_modificado.csv')
+	df = readCsv(file_path)
+	df_mod = None
+	# Verifica se o DataFrame foi criado
+	if df is not None:
+		print("DataFrame criado com sucesso.")
+		df_mod = df.copy()
+	else:
+		print("Erro ao criar o DataFrame. Verifique o arquivo CSV.")
+		return
+
+	df_mod, entity_mapping = clean_dataframe(df_mod, args.backend)
+
+	# Salva o mapeamento das entidades resolvidas
+	if entity_mapping is not None:
+		file_mapeamento = os.path.join(os.getcwd(), 'result', 'mapeamento_entidades.csv')
+		save_cleaned_dataframe(entity_mapping, file_mapeamento)
+
+	# Transforma o header (nomes das colunas) em maiúsculas
+	df.columns = df.columns.str.upper()
+	df_mod.columns = df_mod.columns.str.upper()
+
+	# Chamando a função para salvar o DataFrame limpo
 	print("Salvando o DataFrame limpo...")
 	file_csv = os.path.join(os.getcwd(), 'result', 'compras_normalizadas.csv')
 	save_cleaned_dataframe(df_mod, file_csv)
 
-# Gerando o relatório de alterações
-if df is not None and df_mod is not None:
+	# Gerando o relatório de alterações
 	print("Gerando o relatório de alterações...")
-	relatorio = generate_dataframe_change_report(df, df_mod)
-	print(relatorio)
-	# Salvando o relatório em um arquivo Markdown
 	file_relatorio = os.path.join(os.getcwd(), 'result', 'relatorio_alteracoes.md')
-	with open(file_relatorio, 'w', encoding='utf-8') as f:
-		f.write(relatorio)
-		print("Relatório salvo em 'relatorio_alteracoes.md'")
\ No newline at end of file
+	relatorio = save_change_report(df, df_mod, file_relatorio)
+	print(relatorio)
+	print("Relatório salvo em 'relatorio_alteracoes.md'")
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,50 @@
+# Compara o tempo de limpeza dos backends pandas e polars
+#
+# Uso: python tests/benchmark_backends.py --linhas 10000 100000
+# (o backend polars requer: pip install polars pyarrow)
+
+from contextlib import redirect_stdout
+import argparse
+import io
+import time
+
+from conftest import make_vendas
+from main import clean_dataframe
+
+def time_backend(df, backend, repeticoes):
+	"""
+	Mede o menor tempo de clean_dataframe em algumas repetições.
+
+	Parâmetros:
+	df (pd.DataFrame): O DataFrame de entrada.
+	backend (str): Backend das etapas de limpeza ('pandas' ou 'polars').
+	repeticoes (int): Quantidade de execuções.
+
+	Retorna:
+	float: O menor tempo, em segundos.
+	"""
+	tempos = []
+	for _ in range(repeticoes):
+		start = time.perf_counter()
+		# Descarta as mensagens de progresso da limpeza
+		with redirect_stdout(io.StringIO()):
+			clean_dataframe(df.copy(), backend)
+		tempos.append(time.perf_counter() - start)
+	return min(tempos)
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark dos backends de limpeza com dados sintéticos")
+	parser.add_argument('--linhas', type=int, nargs='+', default=[10_000, 100_000],
+		help="Tamanhos dos DataFrames gerados")
+	parser.add_argument('--repeticoes', type=int, default=3, help="Execuções por backend e tamanho")
+	args = parser.parse_args()
+
+	print(f"{'linhas':>10} {'pandas (s)':>12} {'polars (s)':>12} {'ganho':>8}")
+	for linhas in args.linhas:
+		df = make_vendas(linhas)
+		pandas_time = time_backend(df, 'pandas', args.repeticoes)
+		polars_time = time_backend(df, 'polars', args.repeticoes)
+		print(f"{linhas:>10} {pandas_time:>12.3f} {polars_time:>12.3f} {pandas_time / polars_time:>7.1f}x")
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Os módulos do projeto ficam em src/ e são importados diretamente (import main)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import io
+import random
+
+import pandas as pd
+import pytest
+
+
+def make_vendas(n, seed=0):
+	"""
+	Gera um DataFrame de vendas sintético com os mesmos problemas da base real
+	(status abreviados, valores com 'R$' e vírgula, CEPs sem hífen, nulos, acentos).
+	"""
+	rng = random.Random(seed)
+	produtos = ['Notebook Dell', 'Notebok Dell', 'Mouse Logitech', 'Teclado!', 'Monitor LG']
+	marcas = ['Dell', 'Logitech', 'LG', 'Sony']
+	status = ['Pago', 'PC', 'Entg', 'Sep', 'AP', 'Transp', ' Entregue ', None]
+	cidades = ['São Paulo', 'Sao Paulo', 'Rio de Janeiro', 'Curitiba', 'Recife', None]
+	rows = []
+	for _ in range(n):
+		valor = rng.choice([f"R$ {rng.uniform(10, 500):.2f}".replace('.', ','), None, 'abc'])
+		rows.append({
+			'id_da_compra': rng.randint(1, max(n // 2, 1)),
+			'cliente': rng.choice(['Ana Souza', 'ana souza', 'João Lima', 'Joao Lima', None]),
+			'produto': rng.choice(produtos),
+			'valor': valor,
+			'quantidade': rng.randint(0, 5),
+			'total': rng.choice([1.0, None]),
+			'data': rng.choice(['2024-01-05', '2024-02-10', None]),
+			'hora': rng.choice(['10:00:00', '23:15:30', 'bad', None]),
+			'status': rng.choice(status),
+			'cidade': rng.choice(cidades),
+			'estado': 'SP',
+			'pais': 'Brasil',
+			'cep': rng.choice(['01001-000', '1001000', '12.345-678', None]),
+			'frete': rng.choice([10.5, 20.0, None]),
+			'pagamento': rng.choice(['Pix', 'Cartão', None]),
+			'vendedor': rng.choice(['Carlos', 'Carla', None]),
+			'marca': rng.choice(marcas),
+		})
+	# Passa pelo CSV para ter os mesmos tipos de readCsv
+	return pd.read_csv(io.StringIO(pd.DataFrame(rows).to_csv(index=False)))
+
+
+@pytest.fixture
+def vendas():
+	return make_vendas
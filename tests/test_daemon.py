@@ -0,0 +1,78 @@
+import importlib.util
+import os
+
+import pytest
+
+from daemon import claim_job, prepare_queue, process_job
+from main import build_warm_state, clean_dataframe
+
+HAS_POLARS = importlib.util.find_spec('polars') is not None and importlib.util.find_spec('pyarrow') is not None
+BACKENDS = ['pandas', pytest.param('polars', marks=pytest.mark.skipif(not HAS_POLARS, reason="polars/pyarrow não instalados"))]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_job_pequeno_sem_marca_do_estado(vendas, backend):
+	state = build_warm_state(vendas(400, seed=1))
+	# Marca conhecida que não aparece no job
+	state['marca_por_produto']['Monitor Lg'] = 'Samsung'
+
+	for seed in range(20):
+		df_mod, _ = clean_dataframe(vendas(5, seed=seed), backend, state)
+		assert set(df_mod.loc[df_mod['produto'] == 'Monitor Lg', 'marca'].astype(str)) <= {'Samsung'}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_frete_usa_moda_conhecida_da_cidade(vendas, backend):
+	state = build_warm_state()
+	state['frete_por_cidade']['Recife'] = 15.35
+
+	df = vendas(6, seed=3)
+	df['cidade'] = 'Recife'
+	df['frete'] = [5.0, None, 5.0, 5.0, 5.0, 5.0]
+	df['valor'] = '100,00'
+	df['produto'] = 'Mouse Logitech'
+	df['marca'] = 'Logitech'
+	df['vendedor'] = 'Carlos'
+	df['id_da_compra'] = range(6)
+
+	df_mod, _ = clean_dataframe(df.copy(), backend, state)
+	assert sorted(df_mod['frete']) == [5.0, 5.0, 5.0, 5.0, 5.0, 15.35]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_estado_aprende_com_os_jobs(vendas, backend):
+	state = build_warm_state()
+	state['frete_por_cidade']['Recife'] = 99.0
+
+	clean_dataframe(vendas(200, seed=2), backend, state)
+
+	assert {'Curitiba', 'Rio De Janeiro', 'Sao Paulo'} <= set(state['frete_por_cidade'])
+	assert state['frete_por_cidade']['Recife'] == 99.0
+	assert {'Mouse Logitech', 'Monitor Lg'} <= set(state['marca_por_produto'])
+
+
+def test_process_job_move_os_arquivos_da_fila(vendas, tmp_path):
+	prepare_queue(tmp_path)
+	state = build_warm_state()
+	vendas(30, seed=4).to_csv(tmp_path / 'entrada' / 'vendas.csv', index=False)
+
+	# Um arquivo novo com o mesmo nome não sobrescreve o job em andamento
+	valid = claim_job('vendas.csv', tmp_path)
+	(tmp_path / 'entrada' / 'vendas.csv').write_text('a,b\n1,2,3,4\n')
+	malformed = claim_job('vendas.csv', tmp_path)
+	assert valid != malformed and valid.endswith('_vendas.csv') and malformed.endswith('_vendas.csv')
+	assert sorted(os.listdir(tmp_path / 'processando')) == sorted([valid, malformed])
+
+	# Arquivo removido da entrada antes de ser pego
+	assert claim_job('vendas.csv', tmp_path) is None
+
+	process_job(valid, tmp_path, state)
+	process_job(malformed, tmp_path, state)
+
+	name = valid[:-len('.csv')]
+	assert sorted(os.listdir(tmp_path / 'saida')) == sorted([
+		f'{name}_normalizado.csv', f'{name}_mapeamento_entidades.csv', f'{name}_relatorio.md',
+	])
+	assert os.listdir(tmp_path / 'concluidos') == [valid]
+	assert os.listdir(tmp_path / 'erros') == [malformed]
+	assert os.listdir(tmp_path / 'processando') == []
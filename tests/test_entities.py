@@ -0,0 +1,74 @@
+import time
+
+import pandas as pd
+import pytest
+
+from main import build_entity_mapping, merge_entity_mapping, resolve_entities
+
+
+def canonical_of(df, column):
+	_, mapping = resolve_entities(df.copy())
+	mapping = mapping[mapping['coluna'] == column]
+	return dict(zip(mapping['original'], mapping['canonico']))
+
+
+@pytest.mark.parametrize('column', ['cliente', 'vendedor'])
+@pytest.mark.parametrize('a, b', [
+	('Maria Silva', 'Mario Silva'),
+	('Paula X', 'Paulo X'),
+	('Carla Carvalho', 'Carlos Carvalho'),
+	('Maria Vend', 'Mario Vend'),
+	('Paula Vend', 'Paulo Vend'),
+	('Joao Pereira', 'Joana Pereira'),
+	('Ana Souza', 'Ana Sousa'),
+])
+def test_pessoas_diferentes_nao_sao_unidas(column, a, b):
+	df = pd.DataFrame({column: [a, a, b]})
+	mapping = canonical_of(df, column)
+	assert mapping[a] == a
+	assert mapping[b] == b
+
+
+@pytest.mark.parametrize('column', ['cliente', 'vendedor'])
+def test_variacoes_de_acento_e_espaco_sao_unidas(column):
+	df = pd.DataFrame({column: ['João Silva', 'João Silva', 'Joao Silva', 'JOAO  SILVA', 'João da Silva Santos', 'Joao da Silva Santo']})
+	mapping = canonical_of(df, column)
+	assert mapping['Joao Silva'] == 'João Silva'
+	assert mapping['JOAO  SILVA'] == 'João Silva'
+	assert mapping['Joao da Silva Santo'] == 'João da Silva Santos'
+
+
+def test_cidades_com_grafias_diferentes_sao_unidas():
+	df = pd.DataFrame({'cidade': ['São Paulo', 'São Paulo', 'Sao Paulo', 'Sao Paolo', 'Santos', 'Rio de Janeiro']})
+	mapping = canonical_of(df, 'cidade')
+	assert mapping['Sao Paulo'] == 'São Paulo'
+	assert mapping['Sao Paolo'] == 'São Paulo'
+	assert mapping['Santos'] == 'Santos'
+	assert mapping['Rio de Janeiro'] == 'Rio de Janeiro'
+
+
+def test_mapeamento_conhecido_tem_prioridade():
+	known = {}
+	merge_entity_mapping(known, pd.DataFrame({'coluna': ['cidade'], 'original': ['São Paulo'], 'canonico': ['São Paulo']}))
+
+	df = pd.DataFrame({'cidade': ['Sao Paulo', 'Sao Paulo', 'Recife']})
+	mapping = build_entity_mapping(df, 'cidade', 85, known['cidade'])
+	mapping = dict(zip(mapping['original'], mapping['canonico']))
+	assert mapping == {'Sao Paulo': 'São Paulo', 'Recife': 'Recife'}
+
+	# Recife entra no estado como nova grafia canônica do seu bloco
+	merge_entity_mapping(known, pd.DataFrame({'coluna': ['cidade'] * 2, 'original': ['Sao Paulo', 'Recife'], 'canonico': ['São Paulo', 'Recife']}))
+	assert known['cidade']['mapeamento'] == {'São Paulo': 'São Paulo', 'Sao Paulo': 'São Paulo', 'Recife': 'Recife'}
+	assert sum(len(block) for block in known['cidade']['blocos'].values()) == 2
+
+
+def test_muitos_clientes_unicos_resolvem_rapido():
+	first_names = [f'Nome{i}' for i in range(200)]
+	last_names = [f'Sobrenome{i}' for i in range(50)]
+	names = [f'{first} {last}' for first in first_names for last in last_names]
+	df = pd.DataFrame({'cliente': names})
+
+	start = time.perf_counter()
+	mapping = build_entity_mapping(df, 'cliente', 90)
+	assert len(mapping) == len(names)
+	assert time.perf_counter() - start < 10
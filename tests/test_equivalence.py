@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('polars')
+pytest.importorskip('pyarrow')
+
+from main import build_warm_state, clean_dataframe
+
+# Tamanhos e sementes do gerador; os DataFrames pequenos têm grupos de produto + marca
+# com poucas linhas, onde os limites dos outliers e as medianas caem em valores exatos
+CASES = (
+	[(20, seed) for seed in range(40)]
+	+ [(50, seed) for seed in range(40)]
+	+ [(300, seed) for seed in range(10)]
+	+ [(1000, seed) for seed in range(3)]
+	+ [(3000, seed) for seed in range(2)]
+)
+
+
+def _comparable(df):
+	"""
+	Deixa o resultado de um backend comparável com o do outro.
+
+	Diferenças conhecidas entre os backends, que não mudam os dados:
+	- ordem das categorias: o Polars cria as categorias na ordem em que aparecem;
+	- 'data': datetime64[ns] no pandas e datetime64[us] no Polars;
+	- 'hora': horas inválidas ficam NaT no pandas e None no Polars.
+	"""
+	df = df.copy()
+	df['data'] = df['data'].astype('datetime64[ns]')
+	df['hora'] = df['hora'].where(df['hora'].notna(), None).astype(str)
+	for column in df.columns[df.dtypes == 'category']:
+		df[column] = df[column].astype(str)
+	return df.reset_index(drop=True)
+
+
+def _with_mixed_types(df):
+	"""
+	Simula colunas com tipos misturados, como as lidas em partes com read_csv.
+	"""
+	df = df.astype({'cep': object, 'valor': object, 'frete': object, 'status': object})
+	df.loc[::7, 'cep'] = 12345678
+	df.loc[::5, 'valor'] = 10.5
+	df.loc[::6, 'frete'] = '20,0'
+	df.loc[::9, 'status'] = 3
+	return df
+
+
+@pytest.mark.parametrize('n, seed', CASES)
+def test_pandas_e_polars_produzem_o_mesmo_resultado(vendas, n, seed):
+	df = vendas(n, seed=seed)
+
+	df_pandas, mapping_pandas = clean_dataframe(df.copy(), 'pandas')
+	df_polars, mapping_polars = clean_dataframe(df.copy(), 'polars')
+
+	assert list(df_polars.columns) == list(df_pandas.columns)
+	pd.testing.assert_frame_equal(_comparable(df_polars), _comparable(df_pandas))
+	pd.testing.assert_frame_equal(mapping_polars.reset_index(drop=True), mapping_pandas.reset_index(drop=True))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pandas_e_polars_com_tipos_misturados(vendas, seed):
+	df = _with_mixed_types(vendas(300, seed=seed))
+
+	df_pandas, _ = clean_dataframe(df.copy(), 'pandas')
+	df_polars, _ = clean_dataframe(df.copy(), 'polars')
+	pd.testing.assert_frame_equal(_comparable(df_polars), _comparable(df_pandas))
+
+
+def test_pandas_e_polars_com_estado_em_memoria(vendas):
+	state_pandas = build_warm_state(vendas(400, seed=1), 'pandas')
+	state_polars = build_warm_state(vendas(400, seed=1), 'polars')
+
+	for seed in range(10, 15):
+		df = vendas(50, seed=seed)
+		df_pandas, _ = clean_dataframe(df.copy(), 'pandas', state_pandas)
+		df_polars, _ = clean_dataframe(df.copy(), 'polars', state_polars)
+		pd.testing.assert_frame_equal(_comparable(df_polars), _comparable(df_pandas))
@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+pl = pytest.importorskip('polars')
+pytest.importorskip('pyarrow')
+
+import lazy_backend
+from main import STATUS_MAP
+
+
+def test_colunas_com_tipos_misturados():
+	df = pd.DataFrame({
+		'cep': pd.Series([12345678, '12345-678', None], dtype=object),
+		'valor': pd.Series([10.5, 'R$ 3,20', None], dtype=object),
+		'frete': pd.Series([10.5, '20.0', None], dtype=object),
+		'status': [' Pago ', 'Entg', None],
+	})
+	# Como no pandas: valores que não são texto viram nulos nas colunas tratadas
+	# com .str e continuam sendo convertidos para número nas demais
+	result = lazy_backend.pre_clean_lazy(df, STATUS_MAP)
+	assert result['cep'].tolist()[:2] == [None, '12345-678']
+	assert pd.isna(result['valor'][0]) and result['valor'][1] == 3.2
+	assert result['frete'].tolist()[:2] == ['10.5', '20.0']
+	assert result['status'].tolist()[:2] == ['Pagamento Confirmado', 'Entregue']
+
+
+def test_etapas_finais_sem_colunas_opcionais():
+	df = pd.DataFrame({
+		'produto': ['Mouse', 'Mouse', 'Teclado'],
+		'marca': ['Logitech', 'Logitech', 'Dell'],
+		'valor': [10.0, None, 20.0],
+		'quantidade': [1, 2, 3],
+	})
+	result = lazy_backend.post_clean_lazy(df)
+	assert list(result.columns) == ['produto', 'marca', 'valor', 'quantidade']
+	assert result['valor'].tolist() == [10.0, 10.0, 20.0]